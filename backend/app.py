@@ -1,15 +1,41 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from chat_engine import ChatEngine
-from engine import run_scenario
-from data_ingestion import compute_portfolio_risk_dynamic
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from engine import run_scenario, run_scenario_grid
+from subsystems import LazySubsystem, warm_in_background
 from typing import List
+import itertools
 import math
+import os
 
-app = FastAPI()
 
-chat_engine = ChatEngine(model_path="models/gguf/qwen2.5-3b-finance.gguf")
+def load_risk():
+    import data_ingestion
+    import batch_risk
+    return data_ingestion, batch_risk
+
+
+def load_chat():
+    from chat_engine import ChatEngine
+    return ChatEngine(model_path="models/gguf/qwen2.5-3b-finance.gguf")
+
+
+risk = LazySubsystem("risk", load_risk)
+chat = LazySubsystem("chat", load_chat)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # /run-scenario is servable as soon as the worker starts; the heavier
+    # subsystems warm up behind it (set WARMUP=false to load on first use)
+    if os.getenv("WARMUP", "true").lower() == "true":
+        warm_in_background(risk, chat)
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 def clean_data(obj):
     if isinstance(obj, dict):
@@ -32,6 +58,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.get("/healthz")
+async def liveness():
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readiness(subsystem: str | None = None):
+    """
+    Ready once scenarios can be served; pass ?subsystem=risk|chat to gate
+    on a specific subsystem (503 until it has loaded).
+    """
+    subsystems = {"scenarios": {"state": "ready"}, "risk": risk.status(), "chat": chat.status()}
+
+    if subsystem is not None and subsystem not in subsystems:
+        return JSONResponse({"error": f"Unknown subsystem: {subsystem}"}, status_code=404)
+
+    ready = subsystems[subsystem or "scenarios"]["state"] == "ready"
+    return JSONResponse(
+        {"ready": ready, "subsystems": subsystems},
+        status_code=200 if ready else 503,
+    )
+
 @app.post("/risk")
 async def risk_endpoint(data: dict):
     tickers: List[str] = data.get("tickers", [])
@@ -41,9 +88,43 @@ async def risk_endpoint(data: dict):
     if not tickers or not weights or len(tickers) != len(weights):
         return {"error": "tickers and weights must be provided and same length."}
 
-    risk_data = compute_portfolio_risk_dynamic(tickers, weights, portfolio_value)
-    clean_risk_data = clean_data(risk_data)
-    return clean_risk_data
+    # Loading and fetching both block, so keep them off the event loop;
+    # /run-scenario stays responsive while risk warms up or downloads
+    return await run_in_threadpool(_compute_risk, tickers, weights, portfolio_value)
+
+def _compute_risk(tickers, weights, portfolio_value):
+    data_ingestion, _ = risk.get()
+    risk_data = data_ingestion.compute_portfolio_risk_dynamic(tickers, weights, portfolio_value)
+    return clean_data(risk_data)
+
+@app.post("/risk/bulk")
+async def bulk_risk_endpoint(data: dict):
+    portfolios = data.get("portfolios", [])
+    if not portfolios or not isinstance(portfolios, list):
+        return {"error": "portfolios must be provided."}
+
+    _, batch_risk = await run_in_threadpool(risk.get)
+
+    # Reject malformed input up front: once streaming starts, an error can
+    # no longer be reported to the client
+    for p in portfolios:
+        error = batch_risk.validate_portfolio(p)
+        if error:
+            return {"error": error}
+
+    # Pull the first record eagerly so data loading errors surface as JSON,
+    # then stream the rest as it is computed. Both run in the threadpool:
+    # the downloads and matrix products must not block the event loop.
+    records = batch_risk.compute_batch_risk(portfolios)
+    try:
+        first = await run_in_threadpool(next, records)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    return StreamingResponse(
+        batch_risk.iter_ndjson(itertools.chain([first], records)),
+        media_type="application/x-ndjson",
+    )
 
 @app.post("/run-scenario")
 async def run_scenario_api(request: Request):
@@ -51,9 +132,40 @@ async def run_scenario_api(request: Request):
     scenario_id = data.get("scenarioId")
     portfolio = data.get("portfolio", {})
     portfolio_value = data.get("portfolioValue", 0)
-    
+    shocks = data.get("shocks")
+
+    try:
+        result = run_scenario(scenario_id, portfolio, portfolio_value, shocks)
+    except ValueError as e:
+        return {"error": str(e)}
+    return result
+
+
+@app.post("/run-scenario-grid")
+async def run_scenario_grid_api(request: Request):
+    data = await request.json()
+    portfolio = data.get("portfolio", {})
+    portfolio_value = data.get("portfolioValue", 0)
+    grid = data.get("grid", {})
+
+    if not portfolio_value:
+        return {"error": "portfolioValue must be provided."}
 
-    result = run_scenario(scenario_id, portfolio, portfolio_value)
+    # Large sweeps take seconds; keep them off the event loop so the
+    # health checks and other endpoints stay responsive
+    try:
+        result = await run_in_threadpool(
+            run_scenario_grid,
+            portfolio,
+            portfolio_value,
+            grid,
+            scenario_id=data.get("scenarioId"),
+            shocks=data.get("shocks"),
+            paths=int(data.get("paths", 5000)),
+            seed=int(data.get("seed", 42)),
+        )
+    except (ValueError, KeyError, TypeError) as e:
+        return {"error": str(e)}
     return result
 
 
@@ -65,6 +177,7 @@ async def chat_endpoint(request: Request):
     if not user_message:
         return {"error": "No message provided"}
 
+    chat_engine = await run_in_threadpool(chat.get)
     response_text = ""
     for chunk in chat_engine.stream_response(user_message):
         response_text += chunk
@@ -0,0 +1,291 @@
+"""
+Bulk risk for many portfolios drawn from the ASSET_METADATA universe.
+
+    python batch_risk.py portfolios.json -o results.ndjson
+    python batch_risk.py portfolios.ndjson -o results.parquet
+
+Each input portfolio is {"id", "tickers", "weights", "portfolio_value"}.
+"""
+import argparse
+import json
+import math
+import sys
+
+import numpy as np
+import pandas as pd
+
+from data_ingestion import ASSET_METADATA, fetch_asset_prices
+
+MARKET_TICKER = "SPY"
+CONFIDENCE_LEVEL = 0.99
+
+
+def load_returns_matrix(tickers):
+    """
+    Fetch every ticker once into one outer-joined (T, N) frame; each
+    ticker keeps its full history, with NaN on dates it has no data.
+    """
+    returns = {}
+    for ticker in dict.fromkeys(tickers):
+        meta = ASSET_METADATA.get(ticker)
+        if not meta:
+            print(f"Warning: Asset metadata missing for ticker {ticker}")
+            continue
+        try:
+            returns[ticker] = fetch_asset_prices(meta)
+        except Exception as e:
+            print(f"Failed fetching returns for {ticker}: {e}")
+
+    if not returns:
+        raise ValueError("No valid asset returns found.")
+
+    combined = pd.concat(returns.values(), axis=1, join="outer").sort_index()
+    combined.columns = list(returns.keys())
+    return combined
+
+
+def weight_matrix(portfolios, columns):
+    """
+    (N, P) weights over `columns`, normalised per portfolio the same way as
+    compute_portfolio_risk_dynamic (missing tickers dropped, zero sum -> equal weight).
+    """
+    col_index = {t: i for i, t in enumerate(columns)}
+    W = np.zeros((len(columns), len(portfolios)))
+
+    for j, p in enumerate(portfolios):
+        held = []
+        for t, w in zip(p["tickers"], p["weights"]):
+            if t in col_index:
+                W[col_index[t], j] += float(w)
+                held.append(col_index[t])
+        if held and W[:, j].sum() == 0:
+            W[held, j] = 1.0 / len(set(held))
+
+    totals = W.sum(axis=0)
+    nonzero = totals != 0
+    W[:, nonzero] /= totals[nonzero]
+    return W
+
+
+def portfolio_metrics(returns, W, market=None, valid=None):
+    """
+    Risk metrics for all P portfolios at once.
+
+    returns: (T, N) asset returns, W: (N, P) weights, market: optional (T,) market returns
+    valid: optional (T, P) mask of the dates each portfolio is evaluated on
+    Returns a dict of (P,) arrays matching risk_metrics' single-portfolio definitions;
+    var / es are 1-day historical at CONFIDENCE_LEVEL, in return units.
+    """
+    R = np.nan_to_num(np.asarray(returns, dtype=float))
+    PR = R @ W  # (T, P)
+    T, P = PR.shape
+    if valid is None:
+        valid = np.ones((T, P), dtype=bool)
+    PR[~valid] = 0.0
+    n = valid.sum(axis=0)
+    cols = np.arange(P)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = PR.sum(axis=0) / n
+        sq = np.where(valid, (PR - mean) ** 2, 0.0).sum(axis=0)
+        std = np.sqrt(sq / (n - 1))
+        sharpe = mean / std * np.sqrt(252)
+        volatility = np.sqrt(sq / n) * np.sqrt(252)
+
+    # Zero returns on excluded dates leave wealth flat, so drawdowns are
+    # the same as over the valid dates alone
+    wealth = np.cumprod(1 + PR, axis=0)
+    peak = np.maximum.accumulate(wealth, axis=0)
+    max_dd = np.abs(((wealth - peak) / peak).min(axis=0))
+
+    tail_count = np.maximum(1, (n * (1 - CONFIDENCE_LEVEL)).astype(int))
+    worst = np.sort(np.where(valid, PR, np.inf), axis=0)
+    tail_sum = np.cumsum(np.where(np.isfinite(worst), worst, 0.0), axis=0)
+    var = -worst[tail_count - 1, cols]
+    es = -tail_sum[tail_count - 1, cols] / tail_count
+
+    last = T - 1 - np.argmax(valid[::-1], axis=0)
+
+    metrics = {
+        "sharpe": sharpe,
+        "volatility": volatility,
+        "max_drawdown": max_dd,
+        "var": var,
+        "es": es,
+        "latest_return": PR[last, cols],
+        "first_row": np.argmax(valid, axis=0),
+        "last_row": last,
+    }
+
+    if market is not None:
+        # Like portfolio_beta: only dates where the market has a return
+        m = np.asarray(market, dtype=float)
+        mv = valid & np.isfinite(m)[:, None]
+        m0 = np.nan_to_num(m)[:, None]
+        k = mv.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pr_mean = np.where(mv, PR, 0.0).sum(axis=0) / k
+            m_mean = np.where(mv, m0, 0.0).sum(axis=0) / k
+            dm = np.where(mv, m0 - m_mean, 0.0)
+            cov = (np.where(mv, PR - pr_mean, 0.0) * dm).sum(axis=0) / (k - 1)
+            market_var = (dm ** 2).sum(axis=0) / k
+            beta = cov / market_var
+        metrics["beta"] = np.where((k > 1) & (market_var != 0), beta, 0.0)
+
+    return metrics
+
+
+def _clean(value):
+    value = float(value)
+    return None if math.isnan(value) or math.isinf(value) else value
+
+
+def validate_portfolio(p):
+    """
+    Error message for a malformed portfolio, or None if it is usable.
+    """
+    if not isinstance(p, dict):
+        return "each portfolio must be an object with tickers and weights."
+    tickers = p.get("tickers", [])
+    weights = p.get("weights", [])
+    if (
+        not isinstance(tickers, list) or not isinstance(weights, list)
+        or not tickers or len(tickers) != len(weights)
+    ):
+        return "each portfolio needs tickers and weights of the same length."
+    if not all(isinstance(t, str) for t in tickers):
+        return "tickers must be strings."
+    if not all(_is_number(w) for w in weights):
+        return "weights must be numbers."
+    if not _is_number(p.get("portfolio_value", 0)):
+        return "portfolio_value must be a number."
+    return None
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def compute_batch_risk(portfolios, chunk_size=1000):
+    """
+    Yield one result record per portfolio, in input order.
+
+    The union of tickers is loaded once and each block of `chunk_size`
+    portfolios is one (T, N) @ (N, P) product. Each portfolio is evaluated
+    only on the dates all of its tickers have data, the same window /risk
+    would use, so results do not depend on what else is in the batch.
+    """
+    universe = [t for p in portfolios for t in p.get("tickers", [])] + [MARKET_TICKER]
+    combined = load_returns_matrix(universe)
+    values = combined.to_numpy(dtype=float)
+    missing = (~np.isfinite(values)).astype(float)
+    market = values[:, combined.columns.get_loc(MARKET_TICKER)] if MARKET_TICKER in combined else None
+    columns = combined.columns.tolist()
+    col_index = {t: i for i, t in enumerate(columns)}
+
+    for start in range(0, len(portfolios), chunk_size):
+        block = portfolios[start:start + chunk_size]
+        W = weight_matrix(block, columns)
+
+        held = np.zeros_like(W)
+        for j, p in enumerate(block):
+            for t in p["tickers"]:
+                if t in col_index:
+                    held[col_index[t], j] = 1.0
+
+        # (T, P): a date counts for a portfolio only if none of its tickers is missing
+        valid = (missing @ held) == 0
+        metrics = portfolio_metrics(values, W, market, valid)
+
+        for j, p in enumerate(block):
+            if W[:, j].sum() == 0 or not valid[:, j].any():
+                yield {"id": p.get("id", start + j), "error": "No valid asset returns found."}
+                continue
+            yield _record(p, start + j, columns, W[:, j], metrics, j, combined.index)
+
+
+def _record(p, default_id, columns, weights, metrics, k, index):
+    value = float(p.get("portfolio_value", 0))
+    latest = metrics["latest_return"][k]
+    first, last = index[metrics["first_row"][k]], index[metrics["last_row"][k]]
+    record = {
+        "id": p.get("id", default_id),
+        "tickers": [columns[i] for i in np.flatnonzero(weights)],
+        "portfolio_value": value,
+        "start_date": str(first.date()) if hasattr(first, "date") else str(first),
+        "end_date": str(last.date()) if hasattr(last, "date") else str(last),
+        "var": _clean(metrics["var"][k]),
+        "es": _clean(metrics["es"][k]),
+        "var_value": _clean(metrics["var"][k] * value),
+        "es_value": _clean(metrics["es"][k] * value),
+        "sharpe": _clean(metrics["sharpe"][k]),
+        "volatility": _clean(metrics["volatility"][k]),
+        "max_drawdown": _clean(metrics["max_drawdown"][k]),
+        "today_change": {
+            "change_abs": round(float(value * latest), 2),
+            "change_pct": round(float(latest * 100), 2),
+        },
+    }
+    if "beta" in metrics:
+        record["beta"] = _clean(metrics["beta"][k])
+    return record
+
+
+def iter_ndjson(records):
+    for record in records:
+        yield json.dumps(record) + "\n"
+
+
+def write_parquet(records, path):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("Parquet output requires pyarrow (pip install pyarrow).")
+    pd.json_normalize(list(records)).to_parquet(path, index=False)
+
+
+def load_portfolios(path):
+    with open(path) as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        data = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if isinstance(data, dict):
+        data = data["portfolios"] if "portfolios" in data else [data]
+    portfolios = data
+    if not isinstance(portfolios, list) or not portfolios:
+        raise ValueError("Input must contain a non-empty list of portfolios.")
+    for i, p in enumerate(portfolios):
+        error = validate_portfolio(p)
+        if error:
+            raise ValueError(f"Portfolio {i}: {error}")
+    return portfolios
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute risk for many portfolios in one pass.")
+    parser.add_argument("input", help="JSON list / {'portfolios': [...]} or NDJSON of portfolios")
+    parser.add_argument("-o", "--output", default=None, help=".ndjson (default: stdout) or .parquet")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    try:
+        portfolios = load_portfolios(args.input)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    records = compute_batch_risk(portfolios, args.chunk_size)
+
+    if args.output and args.output.endswith(".parquet"):
+        write_parquet(records, args.output)
+    elif args.output:
+        with open(args.output, "w") as f:
+            f.writelines(iter_ndjson(records))
+    else:
+        sys.stdout.writelines(iter_ndjson(records))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
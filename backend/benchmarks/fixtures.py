@@ -0,0 +1,93 @@
+import contextlib
+import numpy as np
+import pandas as pd
+
+import data_ingestion
+
+TRADING_DAYS = 252
+
+# (label, n_assets, n_years, n_paths)
+SIZES = [
+    ("small", 5, 5, 1_000),
+    ("medium", 20, 10, 5_000),
+    ("large", 100, 20, 20_000),
+]
+
+
+def synthetic_tickers(n_assets: int) -> list:
+    return [f"SYN{i:04d}" for i in range(n_assets)]
+
+
+def make_returns(n_assets: int, n_years: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Seeded daily log returns for n_assets synthetic tickers plus SPY.
+
+    Returns follow a one-factor model (SPY is the factor) with fat-ish
+    tails, so GARCH fits and correlations behave like real data.
+    """
+    rng = np.random.default_rng(seed)
+    n_days = n_years * TRADING_DAYS
+    dates = pd.bdate_range(end="2025-12-31", periods=n_days)
+
+    market = rng.standard_t(df=5, size=n_days) * 0.01 + 0.0003
+    betas = rng.uniform(0.3, 1.6, size=n_assets)
+    idio_vol = rng.uniform(0.005, 0.02, size=n_assets)
+    idio = rng.standard_t(df=5, size=(n_days, n_assets)) * idio_vol
+
+    returns = market[:, None] * betas + idio
+    df = pd.DataFrame(returns, index=dates, columns=synthetic_tickers(n_assets))
+    df["SPY"] = market
+    df.index.name = "date"
+    return df
+
+
+def make_weights(n_assets: int, seed: int = 42) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    w = rng.uniform(0.0, 1.0, size=n_assets)
+    return w / w.sum()
+
+
+def reference_var_engine(mu: float, sigma: float, confidence_level=0.99, n_sims=50000, seed=42) -> dict:
+    """
+    Same VaR/ES estimator as the C++ VaREngine, used when neither the
+    pybind module nor the var_engine binary is available.
+    """
+    try:
+        import var_engine
+        m = var_engine.VaREngine(confidence_level, n_sims, seed).compute(mu, sigma)
+        return {"var": m.var, "es": m.es}
+    except ImportError:
+        pass
+
+    pnl = np.sort(np.random.default_rng(seed).normal(mu, sigma, size=n_sims))
+    var_index = max(0, int(n_sims * (1 - confidence_level)) - 1)
+    return {"var": float(-pnl[var_index]), "es": float(-pnl[: var_index + 1].mean())}
+
+
+@contextlib.contextmanager
+def offline_data(returns: pd.DataFrame):
+    """
+    Serve `returns` through data_ingestion instead of Yahoo/FRED and the
+    var_engine subprocess, so the risk pipeline runs without network.
+    """
+    original_fetch = data_ingestion.fetch_asset_prices
+    original_var = data_ingestion.run_var_engine
+    original_meta = dict(data_ingestion.ASSET_METADATA)
+
+    def fetch_asset_prices(asset: dict) -> pd.Series:
+        key = asset.get("ticker") or asset.get("series")
+        if key not in returns.columns:
+            raise ValueError(f"No synthetic data for {key}")
+        return returns[key].rename(None)
+
+    for ticker in returns.columns:
+        data_ingestion.ASSET_METADATA.setdefault(ticker, {"type": "equity_etf", "ticker": ticker})
+    data_ingestion.fetch_asset_prices = fetch_asset_prices
+    data_ingestion.run_var_engine = reference_var_engine
+    try:
+        yield
+    finally:
+        data_ingestion.fetch_asset_prices = original_fetch
+        data_ingestion.run_var_engine = original_var
+        data_ingestion.ASSET_METADATA.clear()
+        data_ingestion.ASSET_METADATA.update(original_meta)
@@ -0,0 +1,155 @@
+"""
+Concurrent load-test harness for the FastAPI app.
+
+Against a running deployment:
+
+    python -m benchmarks.loadtest --url http://localhost:8000 --clients 32 --requests 500
+
+In-process (no server, no network; /risk is served from synthetic fixtures):
+
+    python -m benchmarks.loadtest --clients 8 --requests 100
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.fixtures import make_returns, make_weights, offline_data, synthetic_tickers
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def payloads(tickers, seed):
+    from betas import ASSET_BETAS
+
+    scenario_assets = list(ASSET_BETAS)[:8]
+    return {
+        "/risk": {
+            "tickers": tickers,
+            "weights": make_weights(len(tickers), seed).tolist(),
+            "portfolio_value": 1_000_000,
+        },
+        "/run-scenario": {
+            "scenarioId": "market-crash",
+            "portfolio": dict(zip(scenario_assets, make_weights(len(scenario_assets), seed).tolist())),
+            "portfolioValue": 1_000_000,
+        },
+        "/chat": {"message": "What is diversification?"},
+    }
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+async def client_worker(client, queue, bodies, latencies, errors):
+    while True:
+        try:
+            endpoint = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        try:
+            r = await client.post(endpoint, json=bodies[endpoint])
+            ok = r.status_code == 200 and "error" not in r.json()
+        except Exception:
+            ok = False
+        latencies[endpoint].append(time.perf_counter() - start)
+        if not ok:
+            errors[endpoint] += 1
+
+
+async def drive(client, endpoints, clients, total, bodies):
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(endpoints[i % len(endpoints)])
+
+    latencies = {e: [] for e in endpoints}
+    errors = {e: 0 for e in endpoints}
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_worker(client, queue, bodies, latencies, errors) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    summary = {}
+    for e in endpoints:
+        lat = sorted(latencies[e])
+        summary[e] = {
+            "requests": len(lat),
+            "errors": errors[e],
+            "p50_ms": percentile(lat, 50) * 1000 if lat else None,
+            "p95_ms": percentile(lat, 95) * 1000 if lat else None,
+            "p99_ms": percentile(lat, 99) * 1000 if lat else None,
+            "mean_ms": statistics.mean(lat) * 1000 if lat else None,
+        }
+    return {
+        "clients": clients,
+        "requests": total,
+        "elapsed_s": elapsed,
+        "throughput_rps": total / elapsed if elapsed else None,
+        "endpoints": summary,
+    }
+
+
+async def main_async(args):
+    if args.url:
+        from data_ingestion import ASSET_METADATA
+        bodies = payloads(list(ASSET_METADATA)[:args.assets], args.seed)
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+            return await drive(client, args.endpoints, args.clients, args.requests, bodies)
+
+    # In-process: keep the chat model out of the way unless explicitly configured
+    os.environ.setdefault("CI", "true")
+    # Like run_benchmarks: measure the pipelines, not repeated cache hits
+    if not args.cache:
+        os.environ["RISK_CACHE_BACKEND"] = "off"
+    from app import app
+
+    bodies = payloads(synthetic_tickers(args.assets), args.seed)
+    returns = make_returns(args.assets, args.years, args.seed)
+    transport = httpx.ASGITransport(app=app)
+    with offline_data(returns) if "/risk" in args.endpoints else contextlib.nullcontext():
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            return await drive(client, args.endpoints, args.clients, args.requests, bodies)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive the FastAPI app with concurrent clients.")
+    parser.add_argument("--url", default=None, help="base URL of a running server; omit to run in-process")
+    parser.add_argument("--endpoints", nargs="+", default=["/run-scenario", "/risk"],
+                        choices=["/risk", "/run-scenario", "/chat"])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--assets", type=int, default=5)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--cache", action="store_true",
+                        help="keep the result cache on in-process (a --url server uses its own RISK_CACHE_BACKEND)")
+    parser.add_argument("--out", default=None, help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(main_async(args))
+    print(json.dumps(report, indent=2))
+
+    if args.out:
+        out = Path(args.out)
+        if not out.is_absolute() and out.parent == Path("."):
+            RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+            out = RESULTS_DIR / out
+        out.write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Benchmark suite for the risk and scenario pipelines.
+
+Run from backend/:
+
+    python -m benchmarks.run_benchmarks --label my-change
+    python -m benchmarks.run_benchmarks --compare results/base.json results/my-change.json
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+# Measure the pipelines themselves, not cache hits after the warm-up run
+os.environ.setdefault("RISK_CACHE_BACKEND", "off")
+
+from benchmarks.fixtures import SIZES, make_returns, make_weights, offline_data, synthetic_tickers
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def measure(fn, repeat=3):
+    """
+    Time `fn` over `repeat` runs, then run it once more under tracemalloc
+    to record peak memory and net allocations (kept separate so tracing
+    overhead does not leak into the latency numbers).
+    """
+    fn()  # warm-up: imports, caches, first-touch allocations
+
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    diff = after.compare_to(before, "filename")
+    return {
+        "latency_s": {
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.mean(timings),
+        },
+        "peak_bytes": peak,
+        "alloc_blocks": sum(s.count_diff for s in diff if s.count_diff > 0),
+        "alloc_bytes": sum(s.size_diff for s in diff if s.size_diff > 0),
+    }
+
+
+def stages(n_assets, n_years, n_paths, seed):
+    from data_ingestion import compute_portfolio_risk_dynamic
+    from engine import run_scenario
+    from scenarios import simulate_portfolio, estimate_recovery_time
+    from monte_carlo import simulate_correlated_var
+    from betas import ASSET_BETAS
+
+    returns = make_returns(n_assets, n_years, seed)
+    tickers = synthetic_tickers(n_assets)
+    weights = make_weights(n_assets, seed).tolist()
+
+    scenario_assets = list(ASSET_BETAS)[:min(n_assets, len(ASSET_BETAS))]
+    scenario_weights = make_weights(len(scenario_assets), seed)
+    portfolio = dict(zip(scenario_assets, scenario_weights))
+
+    def risk():
+        with offline_data(returns):
+            compute_portfolio_risk_dynamic(tickers, weights, 1_000_000)
+
+    paths = simulate_portfolio(initial_value=1_000_000, mu=-0.12, sigma=0.25, days=365, paths=n_paths, seed=seed)
+
+    yield "compute_portfolio_risk_dynamic", risk
+    yield "simulate_correlated_var", lambda: simulate_correlated_var(returns[tickers], weights, 1_000_000, n_scenarios=n_paths * 50, seed=seed)
+    yield "run_scenario", lambda: run_scenario("market-crash", portfolio, 1_000_000)
+    yield "simulate_portfolio", lambda: simulate_portfolio(initial_value=1_000_000, days=365, paths=n_paths, seed=seed)
+
+    def recovery():
+        np.random.seed(seed)  # estimate_recovery_time draws from the global RNG
+        estimate_recovery_time(paths, 1_000_000)
+
+    yield "estimate_recovery_time", recovery
+
+    try:
+        import var_engine
+    except ImportError:
+        return
+    engine = var_engine.VaREngine(0.99, n_paths * 10, seed)
+    yield "VaREngine.compute", lambda: engine.compute(0.001, 0.02)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, repeat, seed):
+    results = []
+    for label, n_assets, n_years, n_paths in sizes:
+        for stage, fn in stages(n_assets, n_years, n_paths, seed):
+            print(f"[{label}] {stage} ...", end=" ", flush=True)
+            try:
+                m = measure(fn, repeat)
+            except Exception as e:
+                print(f"failed: {e}")
+                results.append({"stage": stage, "size": label, "error": str(e)})
+                continue
+            print(f"{m['latency_s']['median'] * 1000:.1f} ms, peak {m['peak_bytes'] / 2**20:.1f} MiB")
+            results.append({
+                "stage": stage,
+                "size": label,
+                "assets": n_assets,
+                "years": n_years,
+                "paths": n_paths,
+                **m,
+            })
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(base_path, new_path, threshold):
+    base = json.loads(Path(base_path).read_text())
+    new = json.loads(Path(new_path).read_text())
+    base_index = {(r["stage"], r["size"]): r for r in base["results"] if "error" not in r}
+
+    regressions = 0
+    print(f"{'stage':<32} {'size':<8} {'base ms':>10} {'new ms':>10} {'ratio':>7} {'peak ratio':>11}")
+    for r in new["results"]:
+        b = base_index.get((r["stage"], r["size"]))
+        if b is None or "error" in r:
+            continue
+        b_ms = b["latency_s"]["median"] * 1000
+        n_ms = r["latency_s"]["median"] * 1000
+        ratio = n_ms / b_ms if b_ms else float("inf")
+        peak_ratio = r["peak_bytes"] / b["peak_bytes"] if b["peak_bytes"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold or peak_ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{r['stage']:<32} {r['size']:<8} {b_ms:>10.1f} {n_ms:>10.1f} {ratio:>7.2f} {peak_ratio:>11.2f}{flag}")
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the risk and scenario pipelines.")
+    parser.add_argument("--label", default=None, help="results file name (defaults to the git commit)")
+    parser.add_argument("--sizes", nargs="+", default=[s[0] for s in SIZES], choices=[s[0] for s in SIZES])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"))
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(*args.compare, args.threshold) else 0
+
+    sizes = [s for s in SIZES if s[0] in args.sizes]
+    report = run(sizes, args.repeat, args.seed)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    out = RESULTS_DIR / f"{args.label or report['meta']['commit'] or 'latest'}.json"
+    out.write_text(json.dumps(report, indent=2))
+    print(f"Saved {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
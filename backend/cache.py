@@ -0,0 +1,372 @@
+"""
+Two-level cache shared by data_ingestion and engine.
+
+L1 is a per-process LRU dict. L2 is shared across uvicorn workers and is
+selected with RISK_CACHE_BACKEND:
+
+    disk   files under RISK_CACHE_DIR (required; created 0700 and must be
+           owned by this user); numpy arrays are stored as .npy and
+           memory-mapped on read, so workers share one copy in the page
+           cache instead of each holding its own
+    redis  any Redis-compatible server at RISK_CACHE_URL
+    memory in-process stand-in with the same get/set interface (tests)
+    none   L1 only
+    off    no caching at all (benchmarks)
+
+The default is disk when RISK_CACHE_DIR is set, otherwise none.
+L2 values are pickled, so only point it at storage you control.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_TTL = 6 * 60 * 60
+
+# Bump when the shape or meaning of cached results changes so workers on a
+# new release never read entries written by an old one.
+CACHE_VERSION = 1
+
+_ARRAY = "__ndarray__"
+_SERIES = "__series__"
+
+
+class LocalCacheBackend:
+    """
+    Redis-like get/set/delete on a dict, for tests and single-process runs.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires is not None and expires < time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class RedisCacheBackend:
+    def __init__(self, url="redis://localhost:6379/0", client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("RISK_CACHE_BACKEND=redis requires the redis package (pip install redis).")
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, value, ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        self.client.delete(key)
+
+
+class DiskCacheBackend:
+    """
+    One file per key under `directory`, written atomically. The expiry time
+    is stored as the file's mtime. Arrays get their own .npy files so they
+    can be memory-mapped read-only.
+    """
+
+    # Expired entries are swept from `set` at most this often (seconds)
+    SWEEP_INTERVAL = 5 * 60
+
+    def __init__(self, directory):
+        if not directory:
+            raise ValueError("DiskCacheBackend needs a directory (set RISK_CACHE_DIR).")
+        self.directory = Path(directory)
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self._check_private()
+        self._last_sweep = 0.0
+
+    def _check_private(self):
+        """
+        Entries are unpickled on read, so refuse a directory another user
+        could have planted files in.
+        """
+        st = self.directory.stat()
+        if hasattr(os, "getuid") and st.st_uid != os.getuid():
+            raise PermissionError(f"Cache directory {self.directory} is not owned by the current user.")
+        if st.st_mode & 0o077:
+            os.chmod(self.directory, 0o700)
+
+    def sweep(self):
+        """
+        Delete expired entries and temp files abandoned by crashed writers.
+        """
+        now = time.time()
+        self._last_sweep = now
+        for path in self.directory.iterdir():
+            try:
+                mtime = path.stat().st_mtime
+                if path.suffix == ".tmp":
+                    if mtime < now - 60 * 60:
+                        path.unlink()
+                elif mtime < now:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _maybe_sweep(self):
+        if time.time() - self._last_sweep >= self.SWEEP_INTERVAL:
+            try:
+                self.sweep()
+            except OSError as e:
+                print(f"Cache sweep failed: {e}")
+
+    def _path(self, key, suffix):
+        return self.directory / (hashlib.sha256(key.encode()).hexdigest() + suffix)
+
+    def _fresh(self, path):
+        try:
+            return path.stat().st_mtime >= time.time()
+        except FileNotFoundError:
+            return False
+
+    def _write(self, path, write, ttl):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            expires = time.time() + (ttl or 100 * 365 * 24 * 60 * 60)
+            os.utime(tmp, (expires, expires))
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def get(self, key):
+        path = self._path(key, ".pkl")
+        if not self._fresh(path):
+            return None
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value, ttl=None):
+        self._maybe_sweep()
+        self._write(self._path(key, ".pkl"), lambda f: f.write(value), ttl)
+
+    def delete(self, key):
+        self._path(key, ".pkl").unlink(missing_ok=True)
+        for part in (":values", ":index"):
+            self._path(key + part, ".npy").unlink(missing_ok=True)
+
+    def get_array(self, key):
+        path = self._path(key, ".npy")
+        if not self._fresh(path):
+            return None
+        try:
+            return np.load(path, mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def set_array(self, key, array, ttl=None):
+        self._write(self._path(key, ".npy"), lambda f: np.save(f, np.ascontiguousarray(array)), ttl)
+
+
+def _pack(value, backend, key, ttl):
+    """
+    Replace arrays (and the arrays inside a pandas Series) with references
+    to separately stored .npy files when the backend supports it.
+    """
+    if not hasattr(backend, "set_array"):
+        return value
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        backend.set_array(key + ":values", value, ttl)
+        return (_ARRAY,)
+    if type(value).__name__ == "Series" and type(value).__module__.startswith("pandas"):
+        if value.index.dtype == object or value.dtype == object:
+            return value
+        backend.set_array(key + ":values", value.to_numpy(), ttl)
+        backend.set_array(key + ":index", value.index.to_numpy(), ttl)
+        return (_SERIES, value.name, value.index.name)
+    return value
+
+
+def _unpack(value, backend, key):
+    if not (isinstance(value, tuple) and value and value[0] in (_ARRAY, _SERIES)):
+        return value
+    values = backend.get_array(key + ":values")
+    if values is None:
+        return None
+    if value[0] == _ARRAY:
+        return values
+    import pandas as pd
+
+    index = backend.get_array(key + ":index")
+    if index is None:
+        return None
+    return pd.Series(values, index=pd.Index(index, name=value[2]), name=value[1], copy=False)
+
+
+class TieredCache:
+    def __init__(self, backend=None, namespace="risk", l1_size=256, ttl=DEFAULT_TTL):
+        self.backend = backend
+        self.namespace = namespace
+        self.l1_size = l1_size
+        self.ttl = ttl
+        self._l1 = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, key):
+        return f"{self.namespace}:v{CACHE_VERSION}:{key}"
+
+    def get(self, key):
+        full_key = self._key(key)
+        now = time.time()
+
+        with self._lock:
+            item = self._l1.get(full_key)
+            if item is not None:
+                if item[1] >= now:
+                    self._l1.move_to_end(full_key)
+                    return item[0]
+                del self._l1[full_key]
+
+        if self.backend is None:
+            return None
+
+        try:
+            raw = self.backend.get(full_key)
+            if raw is None:
+                return None
+            value = _unpack(pickle.loads(raw), self.backend, full_key)
+        except Exception as e:
+            print(f"Cache read failed for {key}: {e}")
+            return None
+
+        if value is not None:
+            self._set_l1(full_key, value)
+        return value
+
+    def set(self, key, value):
+        full_key = self._key(key)
+        self._set_l1(full_key, value)
+
+        if self.backend is None:
+            return
+        try:
+            packed = _pack(value, self.backend, full_key, self.ttl)
+            self.backend.set(full_key, pickle.dumps(packed, protocol=pickle.HIGHEST_PROTOCOL), self.ttl)
+        except Exception as e:
+            print(f"Cache write failed for {key}: {e}")
+
+    def delete(self, key):
+        full_key = self._key(key)
+        with self._lock:
+            self._l1.pop(full_key, None)
+        if self.backend is not None:
+            self.backend.delete(full_key)
+
+    def clear_l1(self):
+        with self._lock:
+            self._l1.clear()
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def _set_l1(self, full_key, value):
+        with self._lock:
+            self._l1[full_key] = (value, time.time() + self.ttl)
+            self._l1.move_to_end(full_key)
+            while len(self._l1) > self.l1_size:
+                self._l1.popitem(last=False)
+
+
+def make_key(*parts):
+    """
+    Stable key from strings, numbers, dicts, lists and numpy arrays.
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            h.update(np.ascontiguousarray(part).tobytes())
+        elif hasattr(part, "to_numpy"):
+            h.update(np.ascontiguousarray(part.to_numpy()).tobytes())
+        else:
+            h.update(repr(_canonical(part)).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _canonical(obj):
+    if isinstance(obj, dict):
+        return sorted((str(k), _canonical(v)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, (float, np.floating)):
+        return float(obj)
+    return obj
+
+
+def backend_from_env():
+    cache_dir = os.getenv("RISK_CACHE_DIR")
+    kind = os.getenv("RISK_CACHE_BACKEND", "disk" if cache_dir else "none").lower()
+    if kind == "none":
+        return None
+    if kind == "memory":
+        return LocalCacheBackend()
+    if kind == "redis":
+        return RedisCacheBackend(os.getenv("RISK_CACHE_URL", "redis://localhost:6379/0"))
+    if kind == "disk":
+        try:
+            return DiskCacheBackend(cache_dir)
+        except (ValueError, OSError) as e:
+            print(f"Disk cache disabled: {e}")
+            return None
+    raise ValueError(f"Unsupported RISK_CACHE_BACKEND: {kind}")
+
+
+_backend = None
+_backend_loaded = False
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace, ttl=DEFAULT_TTL):
+    """
+    Process-wide cache for `namespace`; all namespaces share one L2 backend.
+    """
+    global _backend, _backend_loaded
+    with _caches_lock:
+        off = os.getenv("RISK_CACHE_BACKEND", "").lower() == "off"
+        if not _backend_loaded and not off:
+            _backend = backend_from_env()
+            _backend_loaded = True
+        if namespace not in _caches:
+            if off:
+                _caches[namespace] = TieredCache(None, namespace=namespace, l1_size=0, ttl=ttl)
+            else:
+                _caches[namespace] = TieredCache(_backend, namespace=namespace, ttl=ttl)
+        return _caches[namespace]
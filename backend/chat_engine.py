@@ -1,5 +1,4 @@
 import os
-from llama_cpp import Llama
 import yaml
 from pathlib import Path
 
@@ -35,6 +34,9 @@ class ChatEngine:
             self.model_path = model_cfg["path"]
             self.n_ctx = model_cfg.get("context_size", 1024)
 
+        # Imported here so CI mode and workers that never chat skip llama_cpp
+        from llama_cpp import Llama
+
         self.model = Llama(
             model_path=self.model_path,
             n_threads=n_threads,
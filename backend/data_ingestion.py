@@ -1,10 +1,9 @@
-import requests
 import pandas as pd
-import yfinance as yf
 import numpy as np
-from arch import arch_model
 import subprocess, json
 from risk_metrics import annualized_volatility, portfolio_beta, sharpe_ratio, max_drawdown
+from monte_carlo import simulate_correlated_var
+from cache import get_cache, make_key
 
 ASSET_METADATA = {
     # Popular stocks (equity_etf type or just "equity")
@@ -42,7 +41,12 @@ def run_var_engine(mu: float, sigma: float) -> dict:
     )
     return json.loads(proc.stdout)
 
-def fetch_asset_prices(asset: dict) -> pd.DataFrame:
+def fetch_asset_prices(asset: dict) -> pd.Series:
+    # Shared across workers, so each history is downloaded once per TTL
+    key = make_key(asset["type"], asset.get("ticker") or asset.get("series"))
+    return get_cache("returns").get_or_compute(key, lambda: load_asset_returns(asset))
+
+def load_asset_returns(asset: dict) -> pd.Series:
     asset_type = asset["type"]
 
     if asset_type == "real_estate":
@@ -60,9 +64,16 @@ def fetch_asset_prices(asset: dict) -> pd.DataFrame:
 
     returns = np.log(df[price_col] / df[price_col].shift(1)).dropna()
 
+    # Recent yfinance returns MultiIndex columns, leaving a one-column frame;
+    # a Series is what callers expect and what the cache can memory-map
+    if isinstance(returns, pd.DataFrame):
+        returns = returns.squeeze("columns")
+
     return returns
 
 def fetch_case_shiller(series_id):
+    import requests
+
     url = "https://api.stlouisfed.org/fred/series/observations"
     params = {
         "series_id": series_id,
@@ -84,6 +95,8 @@ def fetch_case_shiller(series_id):
 
 
 def fetch_yahoo(ticker: str) -> pd.DataFrame:
+    import yfinance as yf
+
     data = yf.download(
         ticker,
         start="2000-01-01",
@@ -102,6 +115,21 @@ def fetch_yahoo(ticker: str) -> pd.DataFrame:
     )
 
 
+def fit_garch(scaled_returns):
+    from arch import arch_model
+
+    am = arch_model(scaled_returns, vol="Garch", p=1, q=1)
+    res = am.fit(disp="off")
+
+    mu_1d = res.params["mu"] / 100
+    sigma_1d = (
+        res.conditional_volatility[-1] / 100
+        if isinstance(res.conditional_volatility, np.ndarray)
+        else res.conditional_volatility.iloc[-1] / 100
+    )
+    return float(mu_1d), float(sigma_1d)
+
+
 def compute_risk_metrics(returns: np.ndarray):
     
     if len(returns) < 50 or np.std(returns) == 0:
@@ -111,14 +139,8 @@ def compute_risk_metrics(returns: np.ndarray):
     try:
         scaled_returns = returns * 100   
 
-        am = arch_model(scaled_returns, vol="Garch", p=1, q=1)
-        res = am.fit(disp="off")
-
-        mu_1d = res.params["mu"] / 100
-        sigma_1d = (
-            res.conditional_volatility[-1] / 100
-            if isinstance(res.conditional_volatility, np.ndarray)
-            else res.conditional_volatility.iloc[-1] / 100
+        mu_1d, sigma_1d = get_cache("garch").get_or_compute(
+            make_key(returns), lambda: fit_garch(scaled_returns)
         )
 
         mu_10d = mu_1d * 10
@@ -247,6 +269,14 @@ def compute_portfolio_risk_dynamic(tickers, weights, portfolio_value):
 )
     portfolio_risk = compute_risk_metrics(portfolio_returns)
 
+    # Correlated multi-asset simulation on the individual holdings
+    try:
+        portfolio_risk["monte_carlo"] = simulate_correlated_var(
+            combined_returns, aligned_weights, portfolio_value
+        )
+    except Exception as e:
+        print("Monte Carlo VaR failed:", e)
+
     portfolio_analytics = compute_analytics(
         returns=pd.Series(portfolio_returns, index=combined_returns.index)
     )
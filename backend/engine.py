@@ -1,29 +1,78 @@
 
-from scenarios import SCENARIOS, get_scenario_impacts, simulate_portfolio, scenario_adjusted_params, expected_loss, max_drawdown, summarize_paths, value_at_risk, estimate_recovery_time
+from scenarios import SCENARIOS, FACTORS, get_scenario_impacts, simulate_portfolio, portfolio_adjusted_params, expected_loss, max_drawdown, summarize_paths, value_at_risk, estimate_recovery_time, custom_scenario, scenario_grid, MAX_GRID_WORK, terminal_shocks, grid_risk_metrics
 from betas import ASSET_BETAS
+from cache import get_cache, make_key
+import math
+import numbers
 import numpy as np
 
 
-def run_scenario(scenario_id, portfolio, portfolio_value):
+def validate_portfolio(portfolio, portfolio_value):
     """
-    scenario_id: string like 'market-crash'
+    portfolio must map assets to finite numeric weights; portfolio_value must be a finite number.
+    """
+    if not isinstance(portfolio, dict):
+        raise ValueError("portfolio must be an object of asset: weight.")
+    for asset, weight in list(portfolio.items()) + [("portfolioValue", portfolio_value)]:
+        if isinstance(weight, bool) or not isinstance(weight, numbers.Real) or not math.isfinite(weight):
+            raise ValueError(f"{asset} must be a finite number.")
+
+
+def weight_total(portfolio):
+    """
+    Sum of the portfolio weights, used to normalise them: clients may send
+    fractions or percentages. Falls back to 1 for an all-zero portfolio.
+    """
+    total = float(sum(portfolio.values()))
+    return total if total != 0 else 1.0
+
+
+def resolve_scenario(scenario_id=None, shocks=None):
+    """
+    Predefined scenario, optionally overridden (or fully specified) by custom factor shocks.
+    """
+    if scenario_id is not None and scenario_id not in SCENARIOS:
+        raise ValueError(f"Unknown scenario: {scenario_id}")
+    base = SCENARIOS.get(scenario_id)
+    if shocks is None:
+        if base is None:
+            raise ValueError("scenarioId or shocks must be provided.")
+        return base
+    return custom_scenario(shocks, base)
+
+
+def run_scenario(scenario_id, portfolio, portfolio_value, shocks=None):
+    """
+    scenario_id: string like 'market-crash', or None when shocks define the scenario
     portfolio: dict, e.g. {'AAPL': 0.3, 'GOOG': 0.5, 'TSLA': 0.2}
     portfolio_value: float, e.g. 1_000_000
+    shocks: optional dict of factor shocks, e.g. {'market': -0.3, 'rates': 0.02}
     """
+    key = make_key("run_scenario", scenario_id, portfolio, portfolio_value, shocks)
+    return get_cache("scenarios").get_or_compute(
+        key, lambda: _run_scenario(scenario_id, portfolio, portfolio_value, shocks)
+    )
+
+
+def _run_scenario(scenario_id, portfolio, portfolio_value, shocks=None):
+    validate_portfolio(portfolio, portfolio_value)
     initial_value = portfolio_value
-    scenario = SCENARIOS[scenario_id]
+    scenario = resolve_scenario(scenario_id, shocks)
     scenario_vector = np.array(list(scenario.values()))
 
     filtered_betas = {asset: beta for asset, beta in ASSET_BETAS.items() if asset in portfolio}
+    total_weight = weight_total(portfolio)
     asset_impacts = {}
+    portfolio_impact = 0.0
     for asset, beta in filtered_betas.items():
         impact = np.dot(beta, scenario_vector)
         # Weight impact by portfolio allocation
         weighted_impact = impact * portfolio[asset]
         asset_impacts[asset] = round(weighted_impact * 100, 2)
+        portfolio_impact += weighted_impact / total_weight
 
-    # Portfolio-level parameters adjusted by scenario
-    mu, sigma = scenario_adjusted_params(0.08, 0.15, scenario_vector)
+    # Portfolio-level parameters adjusted by the holdings' exposure to the scenario
+    mu, sigma = portfolio_adjusted_params(0.08, 0.15, portfolio_impact)
 
     # Simulate portfolio price paths
     paths = simulate_portfolio(
@@ -31,7 +80,7 @@ def run_scenario(scenario_id, portfolio, portfolio_value):
         mu=mu, 
         sigma=sigma, 
         days=365,
-        seed=hash(scenario_id) % (2**32)
+        seed=hash(scenario_id or "custom") % (2**32)
     )
 
 
@@ -58,3 +107,54 @@ def run_scenario(scenario_id, portfolio, portfolio_value):
         "p90": summary["p90"][:90].tolist(),
         }
     }
+
+
+def run_scenario_grid(portfolio, portfolio_value, grid, scenario_id=None, shocks=None, days=365, paths=5000, seed=42):
+    """
+    Evaluate a sweep of factor shocks in one pass.
+
+    grid: {factor: [values] | {"start", "stop", "num"}}, e.g.
+          {"market": {"start": -0.4, "stop": 0.2, "num": 13}, "rates": {"start": -0.05, "stop": 0.05, "num": 11}}
+    scenario_id / shocks: base scenario for the factors not swept (defaults to 0)
+
+    All grid points share one set of Monte Carlo draws. Metrics come back as
+    nested lists of shape `shape` (assetImpact: (assets, *shape)), indexed
+    like `axes`.
+    """
+    key = make_key("run_scenario_grid", portfolio, portfolio_value, grid, scenario_id, shocks, days, paths, seed)
+    return get_cache("scenarios").get_or_compute(
+        key, lambda: _run_scenario_grid(portfolio, portfolio_value, grid, scenario_id, shocks, days, paths, seed)
+    )
+
+
+def _run_scenario_grid(portfolio, portfolio_value, grid, scenario_id, shocks, days, paths, seed):
+    validate_portfolio(portfolio, portfolio_value)
+    base = resolve_scenario(scenario_id, shocks) if (scenario_id or shocks) else None
+    axes, matrix, shape = scenario_grid(grid, base)
+    if len(matrix) * paths > MAX_GRID_WORK:
+        raise ValueError(f"grid points x paths must not exceed {MAX_GRID_WORK}.")
+
+    assets = [a for a in ASSET_BETAS if a in portfolio]
+    betas = np.array([ASSET_BETAS[a] for a in assets]).reshape(len(assets), len(FACTORS))
+    weights = np.array([portfolio[a] for a in assets], dtype=float)
+
+    # (assets, factors) @ (factors, G) -> weighted per-asset impact per grid point
+    asset_impacts = (betas @ matrix.T) * weights[:, None]
+    portfolio_impact = asset_impacts.sum(axis=0) / weight_total(portfolio)
+
+    mu, sigma = portfolio_adjusted_params(0.08, 0.15, portfolio_impact)
+    el, var = grid_risk_metrics(
+        portfolio_value, mu, sigma, terminal_shocks(days, paths, seed), days=days
+    )
+
+    return {
+        "factors": list(axes),
+        "axes": {f: np.round(v, 6).tolist() for f, v in axes.items()},
+        "shape": list(shape),
+        "assets": assets,
+        "assetImpact": np.round(asset_impacts * 100, 2).reshape(len(assets), *shape).tolist(),
+        "portfolioImpact": np.round(portfolio_impact * 100, 2).reshape(shape).tolist(),
+        "expectedLoss": np.round(el, 0).reshape(shape).tolist(),
+        "expectedLossPct": np.round(el / portfolio_value * 100, 2).reshape(shape).tolist(),
+        "VaR95": np.round(var * 100, 2).reshape(shape).tolist(),
+    }
@@ -0,0 +1,145 @@
+import numpy as np
+
+# Above this many assets "auto" switches from a full Cholesky factor to a
+# low-rank PCA factor model plus idiosyncratic noise.
+FACTOR_THRESHOLD = 200
+
+# Upper bound on the (scenarios x assets) block held in memory per chunk.
+MAX_CHUNK_ELEMENTS = 4_000_000
+
+
+def covariance_factor(cov, method="auto", n_factors=None):
+    """
+    Decompose a covariance matrix so that X = Z @ loadings.T (+ idio * eps)
+    has covariance `cov` for standard normal Z and eps.
+
+    Returns (loadings, idio_std, method). idio_std is None for Cholesky.
+    """
+    cov = np.atleast_2d(np.asarray(cov, dtype=float))
+    n = cov.shape[0]
+
+    if method == "auto":
+        method = "factor" if n >= FACTOR_THRESHOLD else "cholesky"
+
+    if method == "cholesky":
+        # Sample covariances of short/overlapping histories can be only
+        # positive semi-definite; add the smallest jitter that works.
+        jitter = 0.0
+        scale = np.mean(np.diag(cov)) or 1.0
+        for _ in range(8):
+            try:
+                return np.linalg.cholesky(cov + jitter * np.eye(n)), None, method
+            except np.linalg.LinAlgError:
+                jitter = scale * 1e-10 if jitter == 0.0 else jitter * 100
+        raise ValueError("Covariance matrix is not positive semi-definite.")
+
+    if method == "factor":
+        k = n_factors or min(n, max(5, int(np.sqrt(n))))
+        eigvals, eigvecs = np.linalg.eigh(cov)
+        top = np.argsort(eigvals)[::-1][:k]
+        loadings = eigvecs[:, top] * np.sqrt(np.clip(eigvals[top], 0.0, None))
+        resid = np.clip(np.diag(cov) - np.sum(loadings ** 2, axis=1), 0.0, None)
+        return loadings, np.sqrt(resid), method
+
+    raise ValueError(f"Unsupported method: {method}")
+
+
+def simulate_correlated_var(
+    returns,
+    weights,
+    portfolio_value=1.0,
+    n_scenarios=100_000,
+    horizon_days=10,
+    confidence_level=0.99,
+    method="auto",
+    n_factors=None,
+    chunk_size=50_000,
+    seed=42,
+):
+    """
+    Multi-asset Monte Carlo VaR / ES.
+
+    returns: (T, N) daily log returns, e.g. `combined_returns` (DataFrame or ndarray)
+    weights: (N,) portfolio weights aligned with the columns of `returns`
+
+    Asset returns are drawn from N(mu, cov) of the history scaled to
+    `horizon_days`, revalued against `weights` in chunks so memory stays
+    bounded for large universes and scenario counts. VaR / ES follow the
+    same estimator as the C++ VaREngine; per-asset components are the Euler
+    allocations (ES: tail average, VaR: average around the VaR quantile,
+    normalised to sum to VaR).
+    """
+    tickers = list(getattr(returns, "columns", range(np.shape(returns)[1])))
+    R = np.asarray(returns, dtype=float)
+    w = np.asarray(weights, dtype=float)
+    n_assets = R.shape[1]
+
+    if w.shape != (n_assets,):
+        raise ValueError("weights must have one entry per returns column.")
+
+    mu = R.mean(axis=0) * horizon_days
+    cov = np.atleast_2d(np.cov(R, rowvar=False)) * horizon_days
+    loadings, idio_std, method = covariance_factor(cov, method, n_factors)
+
+    var_index = max(0, int(n_scenarios * (1 - confidence_level)) - 1)
+    tail_count = var_index + 1
+    band = max(1, tail_count // 10)
+    keep = min(n_scenarios, tail_count + band)
+
+    chunk_size = max(1, min(chunk_size, MAX_CHUNK_ELEMENTS // n_assets))
+    rng = np.random.default_rng(seed)
+
+    losses = np.empty(n_scenarios)
+    worst_losses = np.empty(0)
+    worst_contrib = np.empty((0, n_assets))
+
+    for start in range(0, n_scenarios, chunk_size):
+        m = min(chunk_size, n_scenarios - start)
+
+        # One block per chunk keeps the draw stream independent of chunk_size
+        k = loadings.shape[1]
+        Z = rng.standard_normal((m, k + (n_assets if idio_std is not None else 0)))
+        X = Z[:, :k] @ loadings.T
+        if idio_std is not None:
+            X += Z[:, k:] * idio_std
+        X += mu
+
+        chunk_losses = -(X @ w)
+        losses[start:start + m] = chunk_losses
+
+        # Only the `keep` worst scenarios so far are needed for components.
+        if len(worst_losses) == keep:
+            cand = np.flatnonzero(chunk_losses > worst_losses.min())
+        else:
+            cand = np.arange(m)
+        if len(cand):
+            worst_losses = np.concatenate([worst_losses, chunk_losses[cand]])
+            worst_contrib = np.concatenate([worst_contrib, -(X[cand] * w)])
+            if len(worst_losses) > keep:
+                top = np.argpartition(worst_losses, -keep)[-keep:]
+                worst_losses, worst_contrib = worst_losses[top], worst_contrib[top]
+
+    order = np.argsort(worst_losses)[::-1]
+    worst_contrib = worst_contrib[order]
+
+    sorted_losses = np.sort(losses)[::-1]
+    var = float(sorted_losses[var_index])
+    es = float(sorted_losses[:tail_count].mean())
+
+    component_es = worst_contrib[:tail_count].mean(axis=0)
+    component_var = worst_contrib[max(0, var_index - band):var_index + band + 1].mean(axis=0)
+    if component_var.sum() != 0:
+        component_var *= var / component_var.sum()
+
+    return {
+        "var": var,
+        "es": es,
+        "var_value": var * portfolio_value,
+        "es_value": es * portfolio_value,
+        "component_var": {str(t): float(c) for t, c in zip(tickers, component_var)},
+        "component_es": {str(t): float(c) for t, c in zip(tickers, component_es)},
+        "method": method,
+        "n_scenarios": n_scenarios,
+        "horizon_days": horizon_days,
+        "confidence_level": confidence_level,
+    }
@@ -1,7 +1,8 @@
 
+import math
+import numbers
 import numpy as np
 from betas import ASSET_BETAS
-from hmmlearn.hmm import GaussianHMM
 
 FACTORS = [
     "market",
@@ -72,6 +73,124 @@ SCENARIOS = {
 }
 
 
+MAX_GRID_POINTS = 100_000
+
+# Cap on grid points x Monte Carlo paths per request (~2 s of work)
+MAX_GRID_WORK = 50_000_000
+
+
+def validate_shock(factor, value):
+    """
+    A factor shock must be a finite number above -1 (a -100% move).
+    """
+    if isinstance(value, bool) or not isinstance(value, numbers.Real) or not math.isfinite(value):
+        raise ValueError(f"Shock for {factor} must be a finite number.")
+    if value <= -1:
+        raise ValueError(f"Shock for {factor} must be greater than -1.")
+    return float(value)
+
+
+def custom_scenario(shocks, base=None):
+    """
+    Build a scenario dict from user-supplied factor shocks.
+
+    shocks: {factor: shock}, missing factors fall back to `base` (or 0)
+    base: optional scenario dict to start from, e.g. SCENARIOS["recession"]
+    """
+    if not isinstance(shocks, dict):
+        raise ValueError("shocks must be an object of factor: shock.")
+    unknown = set(shocks) - set(FACTORS)
+    if unknown:
+        raise ValueError(f"Unknown factors: {sorted(unknown)}")
+
+    base = base or {}
+    return {f: validate_shock(f, shocks.get(f, base.get(f, 0.0))) for f in FACTORS}
+
+
+def grid_axis(factor, spec):
+    """
+    Axis values from either an explicit list or {"start", "stop", "num"}.
+    Sizes are checked before anything is allocated.
+    """
+    if isinstance(spec, dict):
+        num = spec.get("num")
+        if isinstance(num, bool) or not isinstance(num, int) or not 1 <= num <= MAX_GRID_POINTS:
+            raise ValueError(f"num for {factor} must be an integer between 1 and {MAX_GRID_POINTS}.")
+        start = validate_shock(factor, spec.get("start"))
+        stop = validate_shock(factor, spec.get("stop"))
+        return np.linspace(start, stop, num)
+
+    if not isinstance(spec, list) or not 1 <= len(spec) <= MAX_GRID_POINTS:
+        raise ValueError(f"Axis for {factor} must be a list of 1 to {MAX_GRID_POINTS} shocks.")
+    return np.array([validate_shock(factor, v) for v in spec])
+
+
+def scenario_grid(grid, base=None):
+    """
+    Cartesian product of factor shocks.
+
+    grid: {factor: axis spec}, e.g. {"market": {"start": -0.4, "stop": 0.2, "num": 13},
+                                     "rates": [-0.05, 0.0, 0.05]}
+    base: scenario dict for the factors not swept
+
+    Returns (axes, matrix, shape): matrix is (G, len(FACTORS)) in row-major
+    order over `shape`, so results reshape straight back onto the grid.
+    """
+    if not isinstance(grid, dict) or not grid:
+        raise ValueError("grid must sweep at least one factor.")
+    unknown = set(grid) - set(FACTORS)
+    if unknown:
+        raise ValueError(f"Unknown factors: {sorted(unknown)}")
+
+    base_vector = np.array(list(custom_scenario({}, base).values()))
+    axes = {f: grid_axis(f, spec) for f, spec in grid.items()}
+
+    shape = tuple(len(v) for v in axes.values())
+    if math.prod(shape) > MAX_GRID_POINTS:
+        raise ValueError(f"grid must have between 1 and {MAX_GRID_POINTS} points.")
+
+    matrix = np.tile(base_vector, (int(np.prod(shape)), 1))
+    mesh = np.meshgrid(*axes.values(), indexing="ij")
+    for factor, values in zip(axes, mesh):
+        matrix[:, FACTORS.index(factor)] = values.ravel()
+
+    return axes, matrix, shape
+
+
+def terminal_shocks(days=365, paths=5000, seed=42):
+    """
+    Summed standard normal increments per path, drawn once and shared by
+    every grid point. Same stream as simulate_portfolio for a given seed.
+    """
+    if paths < 1 or days < 1:
+        raise ValueError("paths and days must be at least 1.")
+    return np.random.RandomState(seed).standard_normal((paths, days)).sum(axis=1)
+
+
+def grid_risk_metrics(initial_value, mu, sigma, shocks, days=365, alpha=0.05, chunk_elements=5_000_000):
+    """
+    Expected loss and VaR for G (mu, sigma) pairs against shared shocks.
+
+    Equivalent to expected_loss / value_at_risk on simulate_portfolio
+    paths, but only terminal values are formed and grid points are
+    evaluated in blocks to bound peak memory.
+    """
+    dt = 1 / 252
+    mu = np.atleast_1d(mu)
+    sigma = np.atleast_1d(sigma)
+    drift = (mu - 0.5 * sigma**2) * dt * days
+
+    el = np.empty(len(mu))
+    var = np.empty(len(mu))
+    step = max(1, chunk_elements // len(shocks))
+    for start in range(0, len(mu), step):
+        sl = slice(start, start + step)
+        terminal = initial_value * np.exp(drift[sl, None] + (sigma[sl, None] * np.sqrt(dt)) * shocks)
+        el[sl] = initial_value - terminal.mean(axis=1)
+        var[sl] = np.quantile((terminal - initial_value) / initial_value, alpha, axis=1)
+    return el, var
+
+
 def get_scenario_impacts(scenario_dict):
     
     scenario_vector = np.array([scenario_dict[f] for f in FACTORS])
@@ -103,11 +222,17 @@ def simulate_portfolio(
     return price_paths
     
 
-def scenario_adjusted_params(base_mu, base_sigma, scenario):
-    
-    mu = base_mu + scenario[0]
-    sigma = base_sigma * (1 + scenario[1])
-    return mu, sigma
+def portfolio_adjusted_params(base_mu, base_sigma, portfolio_impact):
+    """
+    Drift and volatility for a portfolio whose holdings-weighted factor
+    impact (normalised weights . betas @ scenario) is `portfolio_impact`,
+    a scalar or one value per grid point.
+
+    The impact shifts the drift and, in either direction, widens the
+    volatility, so every factor and the holdings feed the simulated risk.
+    """
+    impact = np.asarray(portfolio_impact, dtype=float)
+    return base_mu + impact, base_sigma * (1 + np.abs(impact))
 
 
 def expected_loss(paths, initial_value):
@@ -0,0 +1,70 @@
+"""
+Lazily loaded backend subsystems.
+
+Importing app only pulls in what /run-scenario needs (numpy, FastAPI).
+The risk stack (pandas, arch, yfinance) and the chat model are loaded on
+first use or by a background warm-up, and report their state to /readyz.
+"""
+import threading
+import time
+
+
+class LazySubsystem:
+    def __init__(self, name, loader):
+        self.name = name
+        self._loader = loader
+        self._value = None
+        self._lock = threading.Lock()
+        self.state = "cold"
+        self.error = None
+        self.load_seconds = None
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def get(self):
+        if self.state == "ready":
+            return self._value
+
+        with self._lock:
+            if self.state != "ready":
+                self.state = "warming"
+                start = time.perf_counter()
+                try:
+                    self._value = self._loader()
+                except Exception as e:
+                    self.state = "failed"
+                    self.error = str(e)
+                    raise
+                self.load_seconds = time.perf_counter() - start
+                self.error = None
+                self.state = "ready"
+        return self._value
+
+    def warm(self):
+        try:
+            self.get()
+        except Exception as e:
+            print(f"Warm-up of {self.name} failed: {e}")
+
+    def status(self):
+        status = {"state": self.state}
+        if self.load_seconds is not None:
+            status["load_seconds"] = round(self.load_seconds, 3)
+        if self.error:
+            status["error"] = self.error
+        return status
+
+
+def warm_in_background(*subsystems):
+    """
+    Load subsystems one after another on a daemon thread, in the order given.
+    """
+    def run():
+        for s in subsystems:
+            s.warm()
+
+    thread = threading.Thread(target=run, name="warmup", daemon=True)
+    thread.start()
+    return thread
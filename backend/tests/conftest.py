@@ -0,0 +1,4 @@
+import os
+
+# Keep tests isolated from any on-disk or Redis cache a developer has running
+os.environ.setdefault("RISK_CACHE_BACKEND", "memory")
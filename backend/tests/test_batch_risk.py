@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from batch_risk import weight_matrix, portfolio_metrics
+from risk_metrics import annualized_volatility, max_drawdown, portfolio_beta, sharpe_ratio
+
+rng = np.random.default_rng(1)
+DATES = pd.bdate_range("2020-01-01", periods=750)
+RETURNS = pd.DataFrame(rng.normal(0.0004, 0.012, size=(750, 4)), index=DATES, columns=["AAPL", "BND", "GOLD", "SPY"])
+PORTFOLIOS = [
+    {"tickers": ["AAPL", "BND"], "weights": [3, 1]},
+    {"tickers": ["GOLD", "AAPL", "BTC"], "weights": [0.5, 0.5, 0.2]},
+    {"tickers": ["BND"], "weights": [0]},
+]
+
+
+def test_weight_matrix_normalises_like_single_portfolio():
+    W = weight_matrix(PORTFOLIOS, RETURNS.columns.tolist())
+
+    assert W.shape == (4, 3)
+    assert np.allclose(W.sum(axis=0), 1.0)
+    assert np.allclose(W[:, 0], [0.75, 0.25, 0, 0])
+    assert np.allclose(W[:, 2], [0, 1, 0, 0])
+
+
+def test_vectorized_metrics_match_single_portfolio():
+    W = weight_matrix(PORTFOLIOS, RETURNS.columns.tolist())
+    metrics = portfolio_metrics(RETURNS.values, W, RETURNS["SPY"].values)
+
+    for j in range(W.shape[1]):
+        pr = pd.Series(RETURNS.values @ W[:, j], index=DATES)
+        assert metrics["sharpe"][j] == pytest.approx(sharpe_ratio(pr))
+        assert metrics["volatility"][j] == pytest.approx(annualized_volatility(pr))
+        assert metrics["max_drawdown"][j] == pytest.approx(max_drawdown(pr))
+        assert metrics["beta"][j] == pytest.approx(portfolio_beta(pr, RETURNS["SPY"]))
+
+
+def test_results_do_not_depend_on_other_portfolios(monkeypatch):
+    import batch_risk
+
+    short = pd.Series(rng.normal(0.001, 0.04, size=200), index=DATES[-200:])
+    history = {**{t: RETURNS[t] for t in RETURNS.columns}, "SOL": short}
+    monkeypatch.setattr(batch_risk, "ASSET_METADATA", {t: {"type": "equity_etf", "ticker": t} for t in history})
+    monkeypatch.setattr(batch_risk, "fetch_asset_prices", lambda meta: history[meta["ticker"]])
+
+    aapl = {"id": "a", "tickers": ["AAPL"], "weights": [1.0]}
+    alone = next(batch_risk.compute_batch_risk([aapl]))
+    mixed = list(batch_risk.compute_batch_risk([aapl, {"id": "s", "tickers": ["SOL", "BND"], "weights": [1, 1]}]))
+
+    # Equal up to BLAS summation order, which depends on the block width
+    assert mixed[0].keys() == alone.keys()
+    for key, value in alone.items():
+        assert mixed[0][key] == (pytest.approx(value) if isinstance(value, float) else value)
+    assert alone["max_drawdown"] == pytest.approx(max_drawdown(RETURNS["AAPL"]))
+    assert mixed[1]["start_date"] == str(DATES[-200].date())
+
+
+def test_masked_metrics_match_sliced_window():
+    W = weight_matrix(PORTFOLIOS[:2], RETURNS.columns.tolist())
+    valid = np.ones((len(DATES), 2), dtype=bool)
+    valid[:300, 1] = False
+
+    masked = portfolio_metrics(RETURNS.values, W, RETURNS["SPY"].values, valid)
+    sliced = portfolio_metrics(RETURNS.values[300:], W[:, 1:], RETURNS["SPY"].values[300:])
+
+    for name in ["sharpe", "volatility", "max_drawdown", "var", "es", "beta", "latest_return"]:
+        assert masked[name][1] == pytest.approx(sliced[name][0])
+
+
+@pytest.mark.parametrize("portfolio", [
+    "AAPL",
+    {"tickers": ["AAPL"], "weights": [1.0, 2.0]},
+    {"tickers": [["AAPL"]], "weights": [1.0]},
+    {"tickers": ["AAPL"], "weights": [True]},
+    {"tickers": ["AAPL"], "weights": [1.0], "portfolio_value": "n/a"},
+])
+def test_validate_portfolio_rejects_malformed(portfolio):
+    from batch_risk import validate_portfolio
+
+    assert validate_portfolio(portfolio) is not None
+    assert validate_portfolio({"tickers": ["AAPL"], "weights": [1.0], "portfolio_value": 1e6}) is None
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+import pytest
+from cache import DiskCacheBackend, LocalCacheBackend, RedisCacheBackend, TieredCache, make_key
+
+
+def test_l2_shared_between_workers():
+    backend = LocalCacheBackend()
+    worker_a = TieredCache(backend, namespace="returns")
+    worker_b = TieredCache(backend, namespace="returns")
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"var": 0.1}
+
+    assert worker_a.get_or_compute("AAPL", compute) == {"var": 0.1}
+    assert worker_b.get_or_compute("AAPL", compute) == {"var": 0.1}
+    assert len(calls) == 1
+
+
+def test_disk_backend_memory_maps_series(tmp_path):
+    backend = DiskCacheBackend(tmp_path)
+    series = pd.Series(np.arange(5, dtype=float), index=pd.bdate_range("2024-01-01", periods=5), name="AAPL")
+
+    TieredCache(backend).set("AAPL", series)
+    loaded = TieredCache(backend).get("AAPL")
+
+    pd.testing.assert_series_equal(loaded, series, check_freq=False)
+    arr = loaded.values
+    while arr is not None and not isinstance(arr, np.memmap):
+        arr = getattr(arr, "base", None)
+    assert arr is not None, "cached series should be memory-mapped, not copied"
+
+
+def test_expired_entries_are_ignored(tmp_path):
+    backend = DiskCacheBackend(tmp_path)
+    backend.set("k", b"value", ttl=-1)
+    assert backend.get("k") is None
+
+
+def test_make_key_is_order_independent_for_dicts():
+    assert make_key({"AAPL": 0.5, "BND": 0.5}) == make_key({"BND": 0.5, "AAPL": 0.5})
+    assert make_key(np.array([1.0, 2.0])) != make_key(np.array([1.0, 2.5]))
+
+
+def test_disk_backend_requires_private_directory(tmp_path):
+    import os
+    import pytest
+
+    with pytest.raises(ValueError):
+        DiskCacheBackend(None)
+
+    shared = tmp_path / "shared"
+    shared.mkdir(mode=0o777)
+    os.chmod(shared, 0o777)
+    DiskCacheBackend(shared)
+    assert shared.stat().st_mode & 0o077 == 0
+
+
+def test_sweep_removes_expired_entries(tmp_path):
+    backend = DiskCacheBackend(tmp_path)
+    backend.set("old", b"value", ttl=-1)
+    backend.set("new", b"value", ttl=60)
+
+    backend.sweep()
+
+    assert backend.get("new") == b"value"
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiry[key] = ex
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.fixture
+def install_backend(monkeypatch):
+    import cache
+
+    def install(backend):
+        monkeypatch.setattr(cache, "_backend", backend)
+        monkeypatch.setattr(cache, "_backend_loaded", True)
+        monkeypatch.setattr(cache, "_caches", {})
+        return cache
+
+    return install
+
+
+def test_fetch_asset_prices_served_memory_mapped_from_l2(tmp_path, monkeypatch, install_backend):
+    import data_ingestion
+
+    cache = install_backend(DiskCacheBackend(tmp_path))
+    dates = pd.bdate_range("2024-01-01", periods=60)
+    # Shape of current yfinance output: MultiIndex columns
+    frame = pd.DataFrame(
+        {("Close", "AAPL"): np.linspace(100, 130, 60)}, index=pd.Index(dates, name="Date")
+    )
+    calls = []
+
+    def fake_yahoo(ticker):
+        calls.append(ticker)
+        return frame[["Close"]].rename(columns={"Close": "price"}).reset_index().rename(columns={"Date": "date"})
+
+    monkeypatch.setattr(data_ingestion, "fetch_yahoo", fake_yahoo)
+
+    first = data_ingestion.fetch_asset_prices(data_ingestion.ASSET_METADATA["AAPL"])
+    cache.get_cache("returns").clear_l1()  # as seen by another worker
+    second = data_ingestion.fetch_asset_prices(data_ingestion.ASSET_METADATA["AAPL"])
+
+    assert calls == ["AAPL"]
+    assert isinstance(second, pd.Series)
+    pd.testing.assert_series_equal(second, first, check_freq=False)
+    arr = second.values
+    while arr is not None and not isinstance(arr, np.memmap):
+        arr = getattr(arr, "base", None)
+    assert arr is not None, "returns should be memory-mapped from L2"
+
+
+def test_run_scenario_served_from_shared_l2(monkeypatch, install_backend):
+    import engine
+
+    cache = install_backend(RedisCacheBackend(client=FakeRedis()))
+    calls = []
+    original = engine._run_scenario
+
+    def counting(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(engine, "_run_scenario", counting)
+
+    first = engine.run_scenario("recession", {"AAPL": 0.6, "BND": 0.4}, 1_000_000)
+    cache.get_cache("scenarios").clear_l1()
+    second = engine.run_scenario("recession", {"AAPL": 0.6, "BND": 0.4}, 1_000_000)
+
+    assert len(calls) == 1
+    assert second == first
+
+
+def test_redis_backend_round_trips_with_ttl():
+    client = FakeRedis()
+    series = pd.Series([0.1, -0.2], index=pd.bdate_range("2024-01-01", periods=2))
+
+    TieredCache(RedisCacheBackend(client=client), ttl=120).set("k", series)
+    loaded = TieredCache(RedisCacheBackend(client=client)).get("k")
+
+    pd.testing.assert_series_equal(loaded, series)
+    assert list(client.expiry.values()) == [120]
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from monte_carlo import simulate_correlated_var
+
+rng = np.random.default_rng(0)
+RETURNS = rng.multivariate_normal(
+    [0.0005, 0.0002, 0.0003],
+    [[4e-4, 1e-4, 5e-5], [1e-4, 2e-4, 2e-5], [5e-5, 2e-5, 1e-4]],
+    size=2000,
+)
+WEIGHTS = np.array([0.5, 0.3, 0.2])
+
+
+def test_components_sum_to_portfolio():
+    result = simulate_correlated_var(RETURNS, WEIGHTS, n_scenarios=20_000)
+
+    assert result["es"] >= result["var"] > 0
+    assert np.isclose(sum(result["component_es"].values()), result["es"])
+    assert np.isclose(sum(result["component_var"].values()), result["var"])
+
+
+@pytest.mark.parametrize("method", ["cholesky", "factor"])
+def test_chunking_does_not_change_result(method):
+    a = simulate_correlated_var(RETURNS, WEIGHTS, n_scenarios=20_000, method=method, n_factors=2, chunk_size=20_000)
+    b = simulate_correlated_var(RETURNS, WEIGHTS, n_scenarios=20_000, method=method, n_factors=2, chunk_size=3_001)
+
+    assert np.isclose(a["var"], b["var"])
+    assert np.isclose(a["es"], b["es"])
+    assert np.allclose(list(a["component_es"].values()), list(b["component_es"].values()))
+
+
+def test_factor_matches_cholesky():
+    chol = simulate_correlated_var(RETURNS, WEIGHTS, n_scenarios=100_000, method="cholesky")
+    factor = simulate_correlated_var(RETURNS, WEIGHTS, n_scenarios=100_000, method="factor", n_factors=3)
+
+    assert abs(chol["var"] - factor["var"]) / chol["var"] < 0.05
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from betas import ASSET_BETAS
+from engine import run_scenario, run_scenario_grid
+from scenarios import FACTORS, SCENARIOS, scenario_grid, portfolio_adjusted_params, simulate_portfolio, value_at_risk, expected_loss
+
+PORTFOLIO = {"AAPL": 0.4, "BND": 0.35, "BTC": 0.25}
+GRID = {
+    "market": {"start": -0.4, "stop": 0.2, "num": 7},
+    "rates": [-0.05, 0.0, 0.05],
+}
+
+
+def test_grid_shape_and_order():
+    axes, matrix, shape = scenario_grid(GRID, SCENARIOS["recession"])
+
+    assert shape == (7, 3)
+    assert matrix.shape == (21, len(FACTORS))
+    assert matrix[4, FACTORS.index("market")] == pytest.approx(axes["market"][1])
+    assert matrix[4, FACTORS.index("rates")] == pytest.approx(0.0)
+    assert matrix[4, FACTORS.index("growth")] == SCENARIOS["recession"]["growth"]
+
+
+def test_grid_matches_single_scenario():
+    result = run_scenario_grid(PORTFOLIO, 1_000_000, GRID, scenario_id="market-crash")
+    i, j = 2, 0
+    shocks = {"market": result["axes"]["market"][i], "rates": result["axes"]["rates"][j]}
+    single = run_scenario("market-crash", PORTFOLIO, 1_000_000, shocks=shocks)
+
+    for k, asset in enumerate(result["assets"]):
+        assert result["assetImpact"][k][i][j] == pytest.approx(single["assetImpact"][asset], abs=0.011)
+
+
+def test_grid_risk_matches_paths():
+    grid = {"market": [-0.2], "rates": [0.05]}
+    result = run_scenario_grid(PORTFOLIO, 1_000_000, grid, paths=2000, seed=7)
+
+    scenario = np.zeros(len(FACTORS))
+    scenario[FACTORS.index("market")], scenario[FACTORS.index("rates")] = -0.2, 0.05
+    impact = sum(w * ASSET_BETAS[a] @ scenario for a, w in PORTFOLIO.items())
+    mu, sigma = portfolio_adjusted_params(0.08, 0.15, impact)
+    paths = simulate_portfolio(1_000_000, mu=mu, sigma=sigma, days=365, paths=2000, seed=7)
+    assert result["VaR95"][0][0] == pytest.approx(round(value_at_risk(paths, 1_000_000) * 100, 2), abs=0.02)
+    assert result["expectedLoss"][0][0] == pytest.approx(expected_loss(paths, 1_000_000), rel=1e-6, abs=1)
+
+
+def test_grid_risk_depends_on_all_factors_and_holdings():
+    grid = {"inflation": [-0.2, 0.0, 0.2], "growth": [-0.2, 0.2]}
+    gold = run_scenario_grid({"GLD": 1.0}, 1_000_000, grid)
+    aapl = run_scenario_grid({"AAPL": 1.0}, 1_000_000, grid)
+
+    assert len({v for row in gold["VaR95"] for v in row}) > 1
+    assert len({v for row in aapl["VaR95"] for v in row}) > 1
+    assert gold["VaR95"] != aapl["VaR95"]
+
+
+def test_unknown_factor_rejected():
+    with pytest.raises(ValueError):
+        run_scenario(None, PORTFOLIO, 1_000_000, shocks={"volatility": 0.1})
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"paths": 0},
+    {"shocks": {"market": None}},
+    {"grid": {"rates": [-1.0, 0.0]}},
+    {"grid": {"market": {"start": -0.4, "stop": 0.2, "num": 1_000_000_000}}},
+])
+def test_invalid_grid_inputs_rejected(kwargs):
+    args = {"grid": GRID, **kwargs}
+    grid = args.pop("grid")
+    with pytest.raises(ValueError):
+        run_scenario_grid(PORTFOLIO, 1_000_000, grid, **args)
+
+
+def test_invalid_single_scenario_inputs_rejected():
+    with pytest.raises(ValueError):
+        run_scenario(None, PORTFOLIO, 1_000_000, shocks={"market": None})
+    with pytest.raises(ValueError):
+        run_scenario(None, PORTFOLIO, 1_000_000, shocks={"rates": -1.0})
+
+
+def test_percent_weights_match_fractions():
+    from fastapi.testclient import TestClient
+    from app import app
+
+    client = TestClient(app)
+    body = {"scenarioId": "market-crash", "portfolioValue": 1_000_000}
+    percent = client.post("/run-scenario", json={**body, "portfolio": {"AAPL": 40, "BND": 35, "BTC": 25}}).json()
+    fraction = client.post("/run-scenario", json={**body, "portfolio": {"AAPL": 0.4, "BND": 0.35, "BTC": 0.25}}).json()
+
+    assert -100 < percent["VaR95"] < 0
+    assert percent["expectedLossPct"] < 100
+    assert percent["VaR95"] == fraction["VaR95"]
+    assert percent["expectedLossPct"] == fraction["expectedLossPct"]
+
+
+def test_grid_total_work_is_capped():
+    grid = {"market": {"start": -0.4, "stop": 0.2, "num": 10_000}}
+    with pytest.raises(ValueError):
+        run_scenario_grid(PORTFOLIO, 1_000_000, grid, paths=50_000)
@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Cold import of the app, excluding interpreter start-up
+IMPORT_BUDGET = 3.0
+
+HEAVY_MODULES = ["pandas", "yfinance", "arch", "hmmlearn", "llama_cpp", "requests"]
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def test_app_import_time_budget():
+    env = {**os.environ, "CI": "true", "WARMUP": "false"}
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    assert result["loaded"] == [], f"Heavy modules imported at startup: {result['loaded']}"
+    assert result["elapsed"] <= IMPORT_BUDGET, f"App import too slow: {result['elapsed']:.2f}s"
+
+
+def test_scenarios_ready_before_risk_and_chat():
+    env = {**os.environ, "CI": "true", "WARMUP": "false"}
+    probe = """
+import json
+from fastapi.testclient import TestClient
+from app import app
+client = TestClient(app)
+out = {
+    "live": client.get("/healthz").status_code,
+    "ready": client.get("/readyz").status_code,
+    "risk": client.get("/readyz", params={"subsystem": "risk"}).status_code,
+    "scenario": "assetImpact" in client.post("/run-scenario", json={
+        "scenarioId": "market-crash", "portfolio": {"AAPL": 1.0}, "portfolioValue": 1000000,
+    }).json(),
+}
+print(json.dumps(out))
+"""
+    proc = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    assert result == {"live": 200, "ready": 200, "risk": 503, "scenario": True}